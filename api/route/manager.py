@@ -1,10 +1,13 @@
+import asyncio
 import os
 
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 from api.service import shell
+from api.service.config import get_resolution_listing_urls
 from api.service.llama_index_updater import load_wikipedia_page_titles, build_index_from_titles
+from api.service.resolution_crawler import ingest_resolutions
 
 router = APIRouter()
 prefix = "/manage"
@@ -21,7 +24,32 @@ def reindex_wikipedia():
         return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
 
     shell.print_green_message("Reindex complete.")
-    return JSONResponse(content={"success": True})
+    if not get_resolution_listing_urls():
+        return JSONResponse(content={"success": True})
+
+    # the rebuild only contains Wikipedia pages; add the resolutions back, mostly from the local cache
+    try:
+        shell.print_yellow_message("Re-adding resolutions...")
+        result = asyncio.run(ingest_resolutions(index_path="data/index"))
+    except Exception as e:
+        shell.print_red_message(f"Re-adding resolutions failed: {e}")
+        return JSONResponse(content={"success": False, "error": f"Re-adding resolutions failed: {e}"},
+                            status_code=500)
+
+    return JSONResponse(content={"success": True, "resolutions": result})
+
+
+@router.get("/ingest-resolutions")
+async def ingest_ecosoc_resolutions():
+    try:
+        shell.print_yellow_message("Starting resolution ingestion...")
+        result = await ingest_resolutions(index_path="data/index")
+    except Exception as e:
+        shell.print_red_message(f"Resolution ingestion failed: {e}")
+        return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
+
+    shell.print_green_message(f"Resolution ingestion complete: {result['added']} added.")
+    return JSONResponse(content={"success": True, **result})
 
 
 def setup(app):
@@ -17,4 +17,25 @@ def get_chat_model():
     return get_env("CHAT_MODEL", "gemma3:1b")
 
 def get_embedding_model():
-    return get_env("EMBEDDING_MODEL", "all-minilm")
\ No newline at end of file
+    return get_env("EMBEDDING_MODEL", "all-minilm")
+
+def get_index_shards():
+    return int(get_env("INDEX_SHARDS", "1"))
+
+
+def get_shard_urls():
+    urls = get_env("SHARD_URLS", "")
+    return [url.strip().rstrip("/") for url in urls.split(",") if url.strip()]
+
+
+def get_resolution_cache_path():
+    return get_env("RESOLUTION_CACHE_PATH", "data/resolutions")
+
+
+def get_resolution_listing_urls():
+    urls = get_env("RESOLUTION_LISTING_URLS", "")
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+def get_crawler_concurrency():
+    return int(get_env("CRAWLER_CONCURRENCY", "8"))
@@ -4,15 +4,19 @@ as the LLM for generation. Embeddings will be created using the OpenAI
 compatible interface provided by llama_index; we'll wire Ollama to the
 indexer's response later.
 """
+import re
+import shutil
+import time
+import zlib
 from pathlib import Path
-from typing import List
+from typing import List, Set
 
-from llama_index.core import VectorStoreIndex
+from llama_index.core import Document, VectorStoreIndex, StorageContext, load_index_from_storage
 from llama_index.embeddings.ollama import OllamaEmbedding
 from llama_index.core import Settings
-from llama_index.core import download_loader
+from llama_index.core.storage.docstore import SimpleDocumentStore
 
-from api.service.config import get_index_path, get_embedding_model, get_ollama_base_url
+from api.service.config import get_index_path, get_embedding_model, get_ollama_base_url, get_index_shards
 
 
 ollama_embedding = OllamaEmbedding(
@@ -27,18 +31,156 @@ Settings.embed_model = ollama_embedding
 DATA_DIR = Path("data")
 WIKI_DIR = DATA_DIR / "wikipedia_pages"
 INDEX_DIR = Path(get_index_path())
+SHARD_PREFIX = "shard_"
+SHARD_PATTERN = re.compile(r"^shard_(\d+)$")
+GENERATION_FILE = "generation"
 
-def build_index_from_titles(titles: List[str], index_path: str = None):
+
+def shard_dirs(index_path: str) -> List[Path]:
+    """Return the shard directories under `index_path`, ordered by shard number."""
+    path = Path(index_path)
+    if not path.is_dir():
+        return []
+    dirs = [p for p in path.iterdir() if p.is_dir() and SHARD_PATTERN.match(p.name)]
+    return sorted(dirs, key=lambda p: int(SHARD_PATTERN.match(p.name).group(1)))
+
+
+def index_generation(path: str):
+    """Return the generation stamp of a persisted index (or shard), None if it has none.
+
+    The stamp changes every time the index is rebuilt or extended, so long-lived
+    shard workers can tell that the copy they hold in memory is stale.
+    """
+    try:
+        return (Path(path) / GENERATION_FILE).read_text()
+    except FileNotFoundError:
+        return None
+
+
+def _persist(index: VectorStoreIndex, path: Path):
+    index.storage_context.persist(persist_dir=str(path))
+    # written last, so a new stamp always points at fully persisted files
+    (path / GENERATION_FILE).write_text(str(time.time_ns()))
+
+
+def _remove_root_index(path: Path):
+    """Remove an unsharded index persisted directly under `path`, keeping any shards."""
+    if not path.is_dir():
+        return
+    for item in path.iterdir():
+        if item.is_file() and (item.suffix == ".json" or item.name == GENERATION_FILE):
+            item.unlink()
+
+
+def shard_for(doc_id: str, shards: int) -> int:
+    """The shard a document lives in. Both full builds and incremental inserts
+    route by this, so a document id is only ever looked up in one shard."""
+    return zlib.crc32(doc_id.encode()) % shards
+
+
+def build_index_from_documents(documents: List[Document], index_path: str = None, shards: int = None):
+    """Build and persist a vector index from `documents`.
+
+    With `shards` > 1 the documents are split by `shard_for` into that many
+    independent indexes, persisted as `shard_0`, `shard_1`, ... under
+    `index_path`. `LlamaRetriever` detects these and queries them in parallel.
+    """
+    path = Path(index_path or str(INDEX_DIR))
+    shards = shards or get_index_shards()
+
+    if shards <= 1:
+        for old in shard_dirs(str(path)):
+            shutil.rmtree(old)
+        index = VectorStoreIndex.from_documents(documents)
+        _persist(index, path)
+        return
+
+    # drop an unsharded index and shards left over from a previous build with a higher shard count
+    _remove_root_index(path)
+    for old in shard_dirs(str(path)):
+        if int(SHARD_PATTERN.match(old.name).group(1)) >= shards:
+            shutil.rmtree(old)
+
+    by_shard = [[] for _ in range(shards)]
+    for document in documents:
+        by_shard[shard_for(document.id_, shards)].append(document)
+
+    for i, shard_documents in enumerate(by_shard):
+        index = VectorStoreIndex.from_documents(shard_documents)
+        _persist(index, path / f"{SHARD_PREFIX}{i}")
+
+
+def _load_or_create_index(path: Path) -> VectorStoreIndex:
+    if (path / "docstore.json").exists():
+        return load_index_from_storage(StorageContext.from_defaults(persist_dir=str(path)))
+    return VectorStoreIndex(nodes=[])
+
+
+def _index_parts(index_path: str) -> List[Path]:
+    """The directories holding the index: every shard, or the index root itself."""
+    return shard_dirs(index_path) or [Path(index_path)]
+
+
+def indexed_doc_ids(index_path: str = None) -> Set[str]:
+    """Return the ids of every source document already in the index (across all shards).
+
+    Only the docstores are read; the vector stores are not loaded.
+    """
+    doc_ids = set()
+    for part in _index_parts(index_path or str(INDEX_DIR)):
+        if (part / "docstore.json").exists():
+            docstore = SimpleDocumentStore.from_persist_dir(str(part))
+            doc_ids.update((docstore.get_all_ref_doc_info() or {}).keys())
+    return doc_ids
+
+
+def add_documents_to_index(documents: List[Document], index_path: str = None) -> int:
+    """Insert `documents` into the persisted index without rebuilding it.
+
+    Documents whose `id_` is already indexed are skipped. On a sharded index,
+    each document goes to the shard picked by `shard_for`, the same routing
+    `build_index_from_documents` uses, so checking that one shard for the id
+    is enough. Only the shards receiving documents are loaded, each once.
+    Returns the number of documents added.
+    """
+    parts = _index_parts(index_path or str(INDEX_DIR))
+
+    by_part = {}
+    for document in documents:
+        part = parts[shard_for(document.id_, len(parts))]
+        by_part.setdefault(part, {})[document.id_] = document
+
+    added = 0
+    for part, part_documents in by_part.items():
+        index = _load_or_create_index(part)
+        new = [d for doc_id, d in part_documents.items() if doc_id not in index.ref_doc_info]
+        if not new:
+            continue
+        for document in new:
+            index.insert(document)
+        _persist(index, part)
+        added += len(new)
+
+    return added
+
+
+def load_wikipedia_page_titles(path: str) -> List[str]:
+    """Read one Wikipedia page title per line, skipping blank lines."""
+    with open(path, "r") as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+
+def build_index_from_titles(titles: List[str], index_path: str = None, shards: int = None):
     """Download Wikipedia pages as text and build a Llama-Index GPTVectorStoreIndex.
 
     This function intentionally keeps model/embedding wiring minimal; the
     exact embedding model will be configured when connecting Ollama.
     """
-    WikipediaReader = download_loader("WikipediaReader")
+    from llama_index.readers.wikipedia import WikipediaReader
+
     loader = WikipediaReader()
     documents = loader.load_data(pages=titles)
-    index = VectorStoreIndex.from_documents(documents)
-    index.storage_context.persist(persist_dir=index_path or str(INDEX_DIR))
+    build_index_from_documents(documents, index_path=index_path, shards=shards)
 
 if __name__ == "__main__":
     build_index_from_titles(["Climate Change"], index_path=str(INDEX_DIR))
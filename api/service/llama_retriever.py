@@ -1,10 +1,18 @@
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import List, Dict
 
+import requests
 from llama_index.core import StorageContext, load_index_from_storage, Settings
 from llama_index.embeddings.ollama import OllamaEmbedding
 
-from api.service.config import get_index_path, get_embedding_model, get_ollama_base_url, get_chat_model
+from api.service import shard_worker, shell
+from api.service.config import get_index_path, get_embedding_model, get_ollama_base_url, get_chat_model, \
+    get_shard_urls
+from api.service.llama_index_updater import shard_dirs
 from llama_index.llms.ollama import Ollama
 
 llm = Ollama(
@@ -35,13 +43,106 @@ class LlamaRetriever:
 
     def __init__(self, index_path: str = None):
         path = index_path or get_index_path()
+        shard_urls = get_shard_urls()
+        if shard_urls:
+            # shards are served by separate processes shared by all API workers
+            self._close_shard_pools()
+            self.index = None
+            self.shard_urls = shard_urls
+            return
+
         if not Path(path).exists():
             raise FileNotFoundError(f"Index path not found: {path}")
+
+        shards = [str(p) for p in shard_dirs(path)]
+        if shards:
+            self.index = None
+            self.shard_urls = None
+            # pools are kept across calls; workers reload their shard themselves when it is rebuilt,
+            # so they are only recreated when the set of shards changes
+            if getattr(self, "shard_paths", None) != shards:
+                self._close_shard_pools()
+                self.shard_pools = [self._start_shard_pool(shard) for shard in shards]
+                self.shard_paths = shards
+            return
+
+        self._close_shard_pools()
+        self.shard_urls = None
         storage_context = StorageContext.from_defaults(persist_dir=path)
         self.index = load_index_from_storage(storage_context)
 
+    @staticmethod
+    def _start_shard_pool(shard: str) -> ProcessPoolExecutor:
+        """Start a single-process pool that loads only `shard`.
+
+        spawn rather than fork: this may run in a threaded server, and a forked
+        worker would also inherit the parent's whole heap. The worker is started
+        and loads its shard now rather than on the first query.
+        """
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=shard_worker.init_shard, initargs=(shard,))
+        pool.submit(shard_worker.loaded_generation).result()
+        return pool
+
+    def _close_shard_pools(self):
+        for pool in getattr(self, "shard_pools", None) or []:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.shard_pools = None
+        self.shard_paths = None
+
+    def _query_shards(self, query_text: str, top_k: int) -> List[Dict]:
+        """Scatter the query to every shard and merge the local top-k lists."""
+        embedding = Settings.embed_model.get_query_embedding(query_text)
+
+        if self.shard_urls:
+            def fetch(url):
+                payload = {"query": query_text, "embedding": embedding, "top_k": top_k}
+                resp = requests.post(f"{url}/retrieve", json=payload, timeout=30)
+                resp.raise_for_status()
+                return resp.json()["results"]
+
+            with ThreadPoolExecutor(max_workers=len(self.shard_urls)) as executor:
+                shard_results = list(executor.map(fetch, self.shard_urls))
+        else:
+            def submit(i):
+                return self.shard_pools[i].submit(shard_worker.retrieve, query_text, embedding, top_k)
+
+            def restart(i):
+                # the shard worker died; replace it so this retriever does not stay broken
+                shell.print_red_message(f"Shard worker for {self.shard_paths[i]} died, restarting it")
+                self.shard_pools[i] = self._start_shard_pool(self.shard_paths[i])
+
+            futures = []
+            for i in range(len(self.shard_pools)):
+                try:
+                    futures.append(submit(i))
+                except BrokenProcessPool:
+                    restart(i)
+                    futures.append(submit(i))
+
+            shard_results = []
+            for i, future in enumerate(futures):
+                try:
+                    shard_results.append(future.result())
+                except BrokenProcessPool:
+                    restart(i)
+                    shard_results.append(submit(i).result())
+
+        merged = heapq.nlargest(top_k, (r for results in shard_results for r in results), key=lambda r: r["score"])
+        return [
+            {
+                "text": r["text"],
+                "score": r["score"],
+                "extra_info": r["extra_info"],
+                "source_info": None
+            } for r in merged
+        ]
+
     def query(self, query_text: str, top_k: int = 5) -> List[Dict]:
         """Return a list of dicts: { 'text': ..., 'score': ..., 'source': {...} }"""
+        if self.index is None:
+            return self._query_shards(query_text, top_k)
+
         query_engine = self.index.as_query_engine(k=top_k, similarity_top_k=top_k, llm=llm)
         response = query_engine.query(query_text)
 
@@ -0,0 +1,209 @@
+"""Crawl ECOSOC resolution listing pages and add new resolutions to the index.
+
+Listing pages are HTML tables with four cells per resolution (symbol, title,
+agenda item, date) and are parsed with `get_formatted_reso_list`. Every
+download goes through a local raw-document cache and is revalidated with
+ETag / Last-Modified conditional requests, so re-crawls only transfer pages
+that changed. Only resolutions whose symbol is not already indexed are
+downloaded, parsed and inserted.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+from llama_index.core import Document
+from pypdf import PdfReader
+
+from api.service import shell
+from api.service.config import get_resolution_cache_path, get_resolution_listing_urls, get_crawler_concurrency
+from api.service.llama_index_updater import add_documents_to_index, indexed_doc_ids
+from api.service.utils import get_formatted_reso_list, is_daccess_url
+
+
+class ResolutionCrawler:
+    def __init__(self, cache_dir: str = None, concurrency: int = None, timeout: float = 30.0):
+        self.cache_dir = Path(cache_dir or get_resolution_cache_path())
+        self.raw_dir = self.cache_dir / "raw"
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.cache_dir / "cache.json"
+        self.concurrency = concurrency or get_crawler_concurrency()
+        self.timeout = timeout
+
+        self.manifest = {}
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+        self._lock = threading.Lock()
+
+    def save_manifest(self):
+        with self._lock:
+            self.manifest_path.write_text(json.dumps(self.manifest, indent=2))
+
+    def _fetch(self, url: str) -> Tuple[bytes, str]:
+        """Download `url`, revalidating the cached copy if there is one.
+
+        Returns the body and its content type.
+        """
+        with self._lock:
+            entry = self.manifest.get(url)
+        cached = self.raw_dir / entry["file"] if entry else None
+
+        headers = {}
+        if cached and cached.exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = requests.get(url, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and headers:
+            return cached.read_bytes(), entry["content_type"]
+        resp.raise_for_status()
+
+        file_name = hashlib.sha1(url.encode()).hexdigest()
+        (self.raw_dir / file_name).write_bytes(resp.content)
+        with self._lock:
+            self.manifest[url] = {
+                "file": file_name,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "content_type": resp.headers.get("Content-Type", ""),
+            }
+        return resp.content, resp.headers.get("Content-Type", "")
+
+    async def fetch(self, url: str) -> Tuple[bytes, str]:
+        return await asyncio.to_thread(self._fetch, url)
+
+    async def _run_pool(self, items: List, handler, label) -> Tuple[List, List[Dict]]:
+        """Run `handler` over `items` with at most `concurrency` in flight.
+
+        Returns the results of the items that succeeded, and a
+        { 'item': label(item), 'error': ... } dict for every item that failed.
+        """
+        queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        results = []
+        failures = []
+
+        async def worker():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results.append(await handler(item))
+                except Exception as e:
+                    shell.print_red_message(f"Failed on {label(item)}: {e}")
+                    failures.append({"item": label(item), "error": str(e)})
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(items)))))
+        return results, failures
+
+    async def crawl_listings(self, listing_urls: List[str]) -> Tuple[List[Dict], List[Dict]]:
+        """Return the resolutions listed on every page, de-duplicated by symbol, and the failed pages."""
+        async def crawl(url):
+            body, _ = await self.fetch(url)
+            return parse_listing(body, url)
+
+        pages, failures = await self._run_pool(listing_urls, crawl, label=lambda url: url)
+        resolutions = {}
+        for page in pages:
+            for reso in page:
+                resolutions.setdefault(reso["symbol"], reso)
+        return list(resolutions.values()), failures
+
+    async def fetch_documents(self, resolutions: List[Dict]) -> Tuple[List[Document], List[Dict]]:
+        """Download and parse every resolution; returns the documents and the failed resolutions."""
+        async def fetch_one(reso):
+            body, content_type = await self.fetch(reso["url"])
+            if "html" in content_type and is_daccess_url(reso["url"], reso["symbol"]):
+                # the document system answers with a redirect page, not the resolution; indexing it
+                # would mark the symbol as done and it would never be fetched again
+                raise ValueError(f"{reso['url']} returned an HTML page instead of the resolution document")
+            text = parse_document(body, content_type)
+            if not text.strip():
+                raise ValueError(f"no text could be extracted from {reso['url']}")
+            return build_document(reso, text)
+
+        return await self._run_pool(resolutions, fetch_one, label=lambda reso: reso["symbol"])
+
+
+def parse_listing(body: bytes, page_url: str) -> List[Dict]:
+    soup = BeautifulSoup(body, "html.parser")
+    entries = soup.select("table td")
+    # ignore a trailing partial row
+    entries = entries[:len(entries) - len(entries) % 4]
+    return [reso for reso in get_formatted_reso_list(entries, page_url) if reso["symbol"]]
+
+
+def parse_document(body: bytes, content_type: str) -> str:
+    if "pdf" in content_type or body.startswith(b"%PDF"):
+        reader = PdfReader(BytesIO(body))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+    if "html" in content_type:
+        return BeautifulSoup(body, "html.parser").get_text("\n", strip=True)
+
+    return body.decode("utf-8", errors="replace")
+
+
+def build_document(reso: Dict, text: str) -> Document:
+    """Wrap a resolution's text in a Document keyed by its symbol.
+
+    The index splits the text into chunks on insert; every chunk keeps this metadata.
+    """
+    return Document(
+        id_=reso["symbol"],
+        text=text,
+        metadata={
+            "symbol": reso["symbol"],
+            "title": reso["title"],
+            "date": reso["date"],
+            "agenda_item": reso["agenda_item"],
+            "url": reso["url"],
+        },
+        excluded_embed_metadata_keys=["url"],
+    )
+
+
+async def ingest_resolutions(listing_urls: Optional[List[str]] = None, index_path: str = None,
+                             cache_dir: str = None, concurrency: int = None) -> Dict:
+    """Crawl `listing_urls` and add every resolution not yet in the index.
+
+    Returns counts of resolutions found on the listing pages and added to the
+    index, plus the listing pages and resolutions that could not be fetched or
+    parsed. Raises if none of the listing pages could be fetched.
+    """
+    listing_urls = listing_urls or get_resolution_listing_urls()
+    if not listing_urls:
+        raise ValueError("No resolution listing URLs given (set RESOLUTION_LISTING_URLS)")
+
+    crawler = ResolutionCrawler(cache_dir=cache_dir, concurrency=concurrency)
+    try:
+        resolutions, listing_failures = await crawler.crawl_listings(listing_urls)
+        if len(listing_failures) == len(listing_urls):
+            raise RuntimeError(f"None of the {len(listing_urls)} resolution listing pages could be fetched")
+
+        existing = await asyncio.to_thread(indexed_doc_ids, index_path)
+        new = [reso for reso in resolutions if reso["symbol"] not in existing]
+        shell.print_cyan_message(f"Found {len(resolutions)} resolutions, {len(new)} new.")
+
+        documents, document_failures = await crawler.fetch_documents(new)
+    finally:
+        crawler.save_manifest()
+
+    # embedding the new chunks is blocking, keep it off the event loop
+    added = await asyncio.to_thread(add_documents_to_index, documents, index_path) if documents else 0
+    return {
+        "found": len(resolutions),
+        "added": added,
+        "failed_listings": listing_failures,
+        "failed_resolutions": document_failures,
+    }
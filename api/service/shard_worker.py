@@ -0,0 +1,101 @@
+"""Query a single index shard.
+
+Each shard worker holds exactly one shard of the index in memory. It is used
+in two ways:
+
+- inside a `ProcessPoolExecutor` owned by `LlamaRetriever`, where
+  `init_shard` is the pool initializer and `retrieve` the task, or
+- as a standalone shard server shared by every API worker:
+
+    python -m api.service.shard_worker data/index/shard_0 --port 8101
+
+The query embedding is computed once by the caller and passed in, so shards
+never call the embedding model themselves. Before each query the worker
+compares the shard's generation stamp on disk with the one it loaded and
+reloads the shard if it was rebuilt or extended since.
+"""
+import argparse
+from typing import List, Dict
+
+from llama_index.core import StorageContext, load_index_from_storage, Settings, QueryBundle
+from llama_index.embeddings.ollama import OllamaEmbedding
+
+from api.service.config import get_embedding_model, get_ollama_base_url
+from api.service.llama_index_updater import index_generation
+
+ollama_embedding = OllamaEmbedding(
+    model_name=get_embedding_model(),
+    base_url=get_ollama_base_url(),
+)
+
+Settings.embed_model = ollama_embedding
+
+_index = None
+_shard_path = None
+_generation = None
+
+
+def init_shard(shard_path: str):
+    """Load the shard at `shard_path` into this process."""
+    global _index, _shard_path, _generation
+    # read the stamp first: if the shard is rewritten while loading, the next query reloads it again
+    generation = index_generation(shard_path)
+    storage_context = StorageContext.from_defaults(persist_dir=shard_path)
+    _index = load_index_from_storage(storage_context)
+    _shard_path = shard_path
+    _generation = generation
+
+
+def loaded_generation():
+    return _generation
+
+
+def retrieve(query_text: str, embedding: List[float], top_k: int) -> List[Dict]:
+    """Return this shard's local top-k as dicts: { 'text', 'score', 'extra_info' }"""
+    if index_generation(_shard_path) != _generation:
+        init_shard(_shard_path)
+
+    retriever = _index.as_retriever(similarity_top_k=top_k)
+    nodes = retriever.retrieve(QueryBundle(query_str=query_text, embedding=embedding))
+    return [
+        {
+            "text": node.node.get_text(),
+            "score": node.score or 0.0,
+            "extra_info": node.node.metadata,
+        } for node in nodes
+    ]
+
+
+def create_app(shard_path: str):
+    from fastapi import FastAPI
+    from pydantic import BaseModel
+
+    class RetrieveRequest(BaseModel):
+        query: str
+        embedding: List[float]
+        top_k: int = 5
+
+    init_shard(shard_path)
+    app = FastAPI()
+
+    @app.post("/retrieve")
+    def retrieve_route(request: RetrieveRequest):
+        return {"results": retrieve(request.query, request.embedding, request.top_k)}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", "shard": shard_path, "generation": loaded_generation()}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a single index shard over HTTP.")
+    parser.add_argument("shard_path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.shard_path), host=args.host, port=args.port)
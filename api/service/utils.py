@@ -1,4 +1,4 @@
-from urllib.parse import urlparse
+from urllib.parse import urljoin
 
 from bs4.element import ResultSet, PageElement
 
@@ -14,19 +14,23 @@ Context is given below.
 Search Query: """
 
 
-def get_url(table_title_entry: PageElement, reso_symbol: str, page_url: str):
-    doc_url = table_title_entry.find_next("a")["href"]
+DACCESS_URL = r"https://daccess-ods.un.org/access.nsf/Get?OpenAgent&DS={}&Lang=E"
 
-    if doc_url.endswith(".pdf"):
-        if doc_url.startswith("http"):
-            return doc_url
 
-        parser = urlparse(page_url)
-        url = f"{parser.scheme}://{parser.netloc}{doc_url}"
-        return url
-    else:
-        eng_url = r"https://daccess-ods.un.org/access.nsf/Get?OpenAgent&DS={}&Lang=E"
-        return eng_url.format(reso_symbol)
+def get_url(table_title_entry: PageElement, reso_symbol: str, page_url: str, table_symbol_entry: PageElement = None):
+    # the document may be linked from the title cell or from the symbol cell
+    for entry in (table_title_entry, table_symbol_entry):
+        link = entry.find("a", href=True) if entry is not None else None
+        if link is not None:
+            # resolves absolute, root-relative and page-relative links alike
+            return urljoin(page_url, link["href"])
+
+    # no link in the row: look the symbol up on the UN document system
+    return DACCESS_URL.format(reso_symbol)
+
+
+def is_daccess_url(url: str, reso_symbol: str):
+    return url == DACCESS_URL.format(reso_symbol)
 
 
 def get_formatted_reso_list(entries: ResultSet, page_url: str):
@@ -34,7 +38,7 @@ def get_formatted_reso_list(entries: ResultSet, page_url: str):
         {
             "symbol": entries[i].get_text(strip=True),
             "title": entries[i + 1].get_text(strip=True),
-            "url": get_url(entries[i + 1], entries[i].get_text(strip=True), page_url),
+            "url": get_url(entries[i + 1], entries[i].get_text(strip=True), page_url, entries[i]),
             "agenda_item": entries[i + 2].get_text(strip=True),
             "date": entries[i + 3].get_text(strip=True)
         } for i in range(0, len(entries), 4)
@@ -5,7 +5,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.service import shell
 
-if not os.environ.get("IS_CONTAINER"):
+# shard workers (see api/service/llama_retriever.py) are spawned processes that re-import
+# this file as `__mp_main__`. They inherit the environment and must not load the routes again.
+is_spawned_worker = __name__ == "__mp_main__"
+
+if not os.environ.get("IS_CONTAINER") and not is_spawned_worker:
     shell.print_yellow_message("Running on bare metal. Loading environment variables from .env file...")
     # docker-compose is configured to set IS_CONTAINER environment variable.
     # if this variable is not set, the app is running on bare metal.
@@ -30,19 +34,24 @@ def read_root():
     return {"ping": "I am alive!"}
 
 
+def load_routes(app):
+    routes = [x.rstrip(".py") for x in os.listdir("api/route") if x.endswith(".py") and not x.startswith("_")]
+
+    for route in routes:
+        shell.print_cyan_message(f"Loading {route}...")
+        try:
+            importlib.util.spec_from_file_location(route, f"api/route/{route}.py")
+            module = importlib.import_module(f"api.route.{route}")
+            module.setup(app)
+            shell.print_green_message("Success!")
+        except Exception as e:
+            shell.print_red_message(f"Failed:")
+            print(e)
+
+
 # load API Routers
-routes = [x.rstrip(".py") for x in os.listdir("api/route") if x.endswith(".py") and not x.startswith("_")]
-
-for route in routes:
-    shell.print_cyan_message(f"Loading {route}...")
-    try:
-        importlib.util.spec_from_file_location(route, f"api/route/{route}.py")
-        module = importlib.import_module(f"api.route.{route}")
-        module.setup(app)
-        shell.print_green_message("Success!")
-    except Exception as e:
-        shell.print_red_message(f"Failed:")
-        print(e)
+if not is_spawned_worker:
+    load_routes(app)
 
 """
 Environment Variables:
@@ -0,0 +1,108 @@
+"""Benchmark sharded vs. single index retrieval.
+
+Builds synthetic corpora with a mock embedding model (no Ollama needed), then
+for every (corpus size, shard count) pair measures query latency and the total
+memory of the retriever process plus its shard workers.
+
+    python bench_shards.py --docs 1000 5000 20000 --shards 1 2 4
+
+Memory is the summed PSS (proportional set size) from /proc/<pid>/smaps_rollup,
+so pages shared between processes, such as shared libraries, are only counted
+once in total. This makes the memory column Linux-only.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from llama_index.core import Document, Settings
+from llama_index.core.embeddings import MockEmbedding
+
+EMBED_DIM = 384
+WORDS = ["resolution", "council", "climate", "security", "trade", "health", "water", "energy",
+         "development", "rights", "peace", "refugee", "ocean", "finance", "education", "migration"]
+
+
+def pss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return 0.0
+
+
+def make_documents(count: int):
+    rng = random.Random(count)
+    return [Document(text=" ".join(rng.choices(WORDS, k=200)), extra_info={"doc": i}) for i in range(count)]
+
+
+def measure(index_path: str, queries: int, top_k: int):
+    """Run in a fresh interpreter so memory only reflects this configuration."""
+    from api.service.llama_retriever import LlamaRetriever
+
+    Settings.embed_model = MockEmbedding(embed_dim=EMBED_DIM)
+    retriever = LlamaRetriever(index_path=index_path)
+
+    def run_query(text):
+        # retrieval only; skips LLM synthesis so both modes do the same work
+        if retriever.index is None:
+            retriever._query_shards(text, top_k)
+        else:
+            retriever.index.as_retriever(similarity_top_k=top_k).retrieve(text)
+
+    run_query("warmup")
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        run_query(f"query {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    pids = [os.getpid()] + [child.pid for child in multiprocessing.active_children()]
+    print(json.dumps({
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1],
+        "pss_mb": sum(pss_mb(pid) for pid in pids),
+    }))
+
+
+def main():
+    from api.service.llama_index_updater import build_index_from_documents
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    Settings.embed_model = MockEmbedding(embed_dim=EMBED_DIM)
+
+    print(f"{'docs':>8} {'shards':>7} {'p50 ms':>9} {'p95 ms':>9} {'PSS MB':>9}")
+    for count in args.docs:
+        documents = make_documents(count)
+        for shards in args.shards:
+            with tempfile.TemporaryDirectory() as index_path:
+                build_index_from_documents(documents, index_path=index_path, shards=shards)
+                out = subprocess.run(
+                    [sys.executable, __file__, "--measure", index_path, str(args.queries), str(args.top_k)],
+                    capture_output=True, text=True, check=True,
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                print(f"{count:>8} {shards:>7} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                      f"{result['pss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main()
@@ -0,0 +1,20 @@
+"""Run this script to crawl ECOSOC resolution listing pages and add any new
+resolutions to the persisted Llama-Index in `data/index`.
+
+Listing pages are taken from the command line, or from RESOLUTION_LISTING_URLS.
+"""
+import asyncio
+import sys
+
+from api.service.resolution_crawler import ingest_resolutions
+
+
+def main():
+    result = asyncio.run(ingest_resolutions(sys.argv[1:] or None, index_path="data/index"))
+    print(f"Found {result['found']} resolutions, added {result['added']} to the index.")
+    for failure in result["failed_listings"] + result["failed_resolutions"]:
+        print(f"Failed: {failure['item']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Crawl a local HTTP fixture server end to end: listing page, a PDF and a text
+resolution, cache revalidation and incremental indexing."""
+import asyncio
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from llama_index.core import Settings
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.storage.docstore import SimpleDocumentStore
+
+from api.service.resolution_crawler import ResolutionCrawler, ingest_resolutions
+from api.service.utils import DACCESS_URL
+
+LISTING = """<html><body><table>
+<tr><th>Symbol</th><th>Title</th><th>Agenda item</th><th>Date</th></tr>
+<tr><td>E/RES/2023/1</td><td><a href="docs/res1.pdf">Climate action</a></td><td>18 (b)</td><td>6 June 2023</td></tr>
+<tr><td>E/RES/2023/2</td><td><a href="/resolutions/docs/res2.txt">Water security</a></td><td>19</td><td>7 June 2023</td></tr>
+<tr><td><a href="docs/res3.txt">E/RES/2023/3</a></td><td>Ocean governance</td><td>20</td><td>8 June 2023</td></tr>
+</table></body></html>
+"""
+
+
+def make_pdf(text: str) -> bytes:
+    """Build a one-page PDF whose page shows `text`."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+@pytest.fixture
+def fixture_server(tmp_path):
+    """Serve a listing page and three resolutions; yields (listing url, list of response status codes)."""
+    site = tmp_path / "site" / "resolutions"
+    (site / "docs").mkdir(parents=True)
+    (site / "index.html").write_text(LISTING)
+    (site / "docs" / "res1.pdf").write_bytes(make_pdf("Climate action resolution text"))
+    (site / "docs" / "res2.txt").write_text("Water security resolution text")
+    (site / "docs" / "res3.txt").write_text("Ocean governance resolution text")
+
+    statuses = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_request(self, code="-", size="-"):
+            statuses.append(int(code))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(tmp_path / "site")))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/resolutions/index.html", statuses
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def stub_embedding():
+    previous = Settings.embed_model
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    yield
+    Settings.embed_model = previous
+
+
+def ingest(url, tmp_path, index="index"):
+    return asyncio.run(ingest_resolutions(
+        [url], index_path=str(tmp_path / index), cache_dir=str(tmp_path / "cache"), concurrency=2,
+    ))
+
+
+def test_incremental_ingest_with_conditional_requests(fixture_server, tmp_path):
+    url, statuses = fixture_server
+
+    first = ingest(url, tmp_path)
+    assert first["found"] == 3
+    assert first["added"] == 3
+    assert first["failed_listings"] == [] and first["failed_resolutions"] == []
+    assert statuses == [200, 200, 200, 200]
+
+    # nothing new: only the listing page is revalidated
+    statuses.clear()
+    second = ingest(url, tmp_path)
+    assert second["added"] == 0
+    assert statuses == [304]
+
+    # a fresh index re-reads every resolution, but they come from the raw cache
+    statuses.clear()
+    third = ingest(url, tmp_path, index="other-index")
+    assert third["added"] == 3
+    assert statuses == [304, 304, 304, 304]
+
+
+def test_indexed_nodes_carry_resolution_metadata(fixture_server, tmp_path):
+    url, _ = fixture_server
+    ingest(url, tmp_path)
+
+    docstore = SimpleDocumentStore.from_persist_dir(str(tmp_path / "index"))
+    nodes = {node.metadata["symbol"]: node for node in docstore.docs.values()}
+
+    assert set(nodes) == {"E/RES/2023/1", "E/RES/2023/2", "E/RES/2023/3"}
+    pdf_node = nodes["E/RES/2023/1"]
+    assert pdf_node.metadata["date"] == "6 June 2023"
+    assert pdf_node.metadata["agenda_item"] == "18 (b)"
+    assert pdf_node.metadata["url"].endswith("/resolutions/docs/res1.pdf")
+    assert "Climate action resolution text" in pdf_node.get_content()
+    assert "Water security resolution text" in nodes["E/RES/2023/2"].get_content()
+    # linked from the symbol cell rather than the title cell
+    assert nodes["E/RES/2023/3"].metadata["url"].endswith("/resolutions/docs/res3.txt")
+
+
+def test_unreachable_listing_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        ingest("http://127.0.0.1:9/resolutions/index.html", tmp_path)
+
+
+def test_daccess_redirect_page_is_not_indexed(tmp_path, monkeypatch):
+    symbol = "E/RES/2023/4"
+    reso = {"symbol": symbol, "title": "Unlinked", "url": DACCESS_URL.format(symbol),
+            "agenda_item": "21", "date": "9 June 2023"}
+    crawler = ResolutionCrawler(cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(crawler, "_fetch", lambda url: (b"<html><body>Redirecting...</body></html>", "text/html"))
+
+    documents, failures = asyncio.run(crawler.fetch_documents([reso]))
+
+    assert documents == []
+    assert [f["item"] for f in failures] == [symbol]
+
+
+def test_manager_registers_resolution_route():
+    from fastapi import FastAPI
+    from api.route import manager
+
+    app = FastAPI()
+    manager.setup(app)
+    assert "/manage/ingest-resolutions" in app.openapi()["paths"]
@@ -0,0 +1,154 @@
+"""Shard layout on disk, shard workers picking up rebuilt shards, and the
+scatter-gather query through `LlamaRetriever`."""
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from llama_index.core import Document, Settings, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.storage.docstore import SimpleDocumentStore
+
+from api.service import shard_worker
+from api.service.llama_index_updater import build_index_from_documents, add_documents_to_index, shard_dirs
+from api.service.llama_retriever import LlamaRetriever
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class HashEmbedding(MockEmbedding):
+    """Deterministic embedding that differs per text, so similarity scores are distinct."""
+
+    def _get_vector_for(self, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255 for b in digest[:self.embed_dim]]
+
+    def _get_query_embedding(self, query):
+        return self._get_vector_for(query)
+
+    def _get_text_embedding(self, text):
+        return self._get_vector_for(text)
+
+    async def _aget_query_embedding(self, query):
+        return self._get_vector_for(query)
+
+    async def _aget_text_embedding(self, text):
+        return self._get_vector_for(text)
+
+
+@pytest.fixture(autouse=True)
+def stub_embedding():
+    previous = Settings.embed_model
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    yield
+    Settings.embed_model = previous
+
+
+def documents(*texts):
+    return [Document(id_=text, text=text) for text in texts]
+
+
+@pytest.fixture
+def retriever_factory(monkeypatch):
+    """Build `LlamaRetriever`s over local shard pools; their workers are shut down afterwards."""
+    monkeypatch.delenv("SHARD_URLS", raising=False)
+    yield LlamaRetriever
+    if LlamaRetriever._instance is not None:
+        LlamaRetriever._instance._close_shard_pools()
+    LlamaRetriever._instance = None
+
+
+def test_shard_dirs_ignores_stray_directories(tmp_path):
+    for name in ["shard_10", "shard_2", "shard_old", "shard_0.bak", "other"]:
+        (tmp_path / name).mkdir()
+
+    assert [p.name for p in shard_dirs(str(tmp_path))] == ["shard_2", "shard_10"]
+
+
+def test_switching_shard_count_removes_previous_layout(tmp_path):
+    build_index_from_documents(documents("a", "b"), index_path=str(tmp_path), shards=1)
+    assert (tmp_path / "docstore.json").exists()
+
+    build_index_from_documents(documents("a", "b"), index_path=str(tmp_path), shards=2)
+    assert not (tmp_path / "docstore.json").exists()
+    assert [p.name for p in shard_dirs(str(tmp_path))] == ["shard_0", "shard_1"]
+
+    build_index_from_documents(documents("a", "b"), index_path=str(tmp_path), shards=1)
+    assert shard_dirs(str(tmp_path)) == []
+    assert (tmp_path / "docstore.json").exists()
+
+
+def test_shard_worker_reloads_extended_shard(tmp_path):
+    build_index_from_documents(documents("first"), index_path=str(tmp_path), shards=1)
+    shard_worker.init_shard(str(tmp_path))
+    embedding = Settings.embed_model.get_query_embedding("query")
+    assert [r["text"] for r in shard_worker.retrieve("query", embedding, 5)] == ["first"]
+
+    add_documents_to_index(documents("second"), index_path=str(tmp_path))
+
+    assert sorted(r["text"] for r in shard_worker.retrieve("query", embedding, 5)) == ["first", "second"]
+
+
+def test_readding_documents_to_sharded_index_is_noop(tmp_path):
+    docs = documents("a", "b", "c", "d")
+    build_index_from_documents(docs, index_path=str(tmp_path), shards=2)
+
+    assert add_documents_to_index(docs, index_path=str(tmp_path)) == 0
+
+    ids_per_shard = [
+        set(SimpleDocumentStore.from_persist_dir(str(shard)).get_all_ref_doc_info() or {})
+        for shard in shard_dirs(str(tmp_path))
+    ]
+    assert sorted(doc_id for ids in ids_per_shard for doc_id in ids) == ["a", "b", "c", "d"]
+
+
+def test_merged_top_k_matches_unsharded_index(tmp_path, retriever_factory):
+    Settings.embed_model = HashEmbedding(embed_dim=16)
+    docs = documents(*[f"resolution text {i}" for i in range(20)])
+    build_index_from_documents(docs, index_path=str(tmp_path), shards=3)
+    expected = VectorStoreIndex.from_documents(docs).as_retriever(similarity_top_k=5).retrieve("water security")
+
+    results = retriever_factory(index_path=str(tmp_path)).query("water security", top_k=5)
+
+    assert [r["text"] for r in results] == [node.node.get_text() for node in expected]
+    assert [r["score"] for r in results] == pytest.approx([node.score for node in expected])
+
+
+def test_dead_shard_worker_is_replaced(tmp_path, retriever_factory):
+    build_index_from_documents(documents("a", "b", "c", "d"), index_path=str(tmp_path), shards=2)
+    retriever = retriever_factory(index_path=str(tmp_path))
+
+    for process in list(retriever.shard_pools[0]._processes.values()):
+        process.kill()
+        process.join()
+
+    assert sorted(r["text"] for r in retriever.query("query", top_k=4)) == ["a", "b", "c", "d"]
+
+
+def test_app_as_main_script_starts_shard_pools_once(tmp_path):
+    """Spawned shard workers re-import the main script; app.py must not load its routes again in them."""
+    build_index_from_documents(documents("a", "b", "c", "d"), index_path=str(tmp_path), shards=2)
+    env = {**os.environ, "IS_CONTAINER": "1", "INDEX_PATH": str(tmp_path), "PYTHONUNBUFFERED": "1"}
+    env.pop("SHARD_URLS", None)
+
+    process = subprocess.Popen([sys.executable, "app.py"], cwd=ROOT, env=env, text=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    lines = []
+    deadline = time.time() + 120
+    try:
+        # app.py goes on to serve forever (or fails to bind); everything of interest is logged before that
+        for line in process.stdout:
+            lines.append(line)
+            if "Uvicorn running" in line or "error while attempting to bind" in line or time.time() > deadline:
+                break
+    finally:
+        process.kill()
+        process.wait()
+
+    output = "".join(lines)
+    assert output.count("Loading wiki...") == 1, output
+    assert "Llama index retriever loaded." in output, output
+    assert "Failed to load Llama index" not in output, output